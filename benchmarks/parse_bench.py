@@ -0,0 +1,130 @@
+"""Time the HTML parsers over saved profile pages.
+
+Save pages first (one request each, stored as benchmarks/pages/<platform>_<username>.html):
+    python -m benchmarks.parse_bench --fetch gfg:someuser codeforces:tourist kaggle:someuser
+
+Then benchmark every saved page:
+    python -m benchmarks.parse_bench --runs 20
+
+"loop lag" is the longest the event loop stalled while the page went through
+run_parser_async, i.e. what an async route would feel.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from tools.codeforces import parse_codeforces_profile
+from tools.gfg import parse_gfg_profile
+from tools.kaggle import parse_kaggle_profile
+import requests
+
+from tools.parsing import PARSE_PROCESS_THRESHOLD, run_parser_async, shutdown_parsers
+from tools.upstream import upstream_get
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+PROFILE_URLS = {
+    "gfg": "https://auth.geeksforgeeks.org/user/{}/practice/",
+    "codeforces": "https://codeforces.com/profile/{}",
+    "kaggle": "https://www.kaggle.com/{}",
+}
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+def _parse(page, platform, username):
+    if platform == "gfg":
+        return parse_gfg_profile(page, username)
+    if platform == "codeforces":
+        try:
+            return parse_codeforces_profile(page)
+        except ValueError:
+            # Raised on pages without a username; still a full parse
+            return None
+    return parse_kaggle_profile(page, username)
+
+
+async def _max_loop_lag(page, platform, username) -> float:
+    lag = 0.0
+    parsing = True
+
+    async def ticker():
+        nonlocal lag
+        while parsing:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, (time.perf_counter() - before - 0.001) * 1000)
+
+    task = asyncio.create_task(ticker())
+    await run_parser_async(_parse, page, platform, username)
+    parsing = False
+    await task
+    return lag
+
+
+def fetch_pages(targets: list[str]) -> None:
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    for target in targets:
+        platform, _, username = target.partition(":")
+        if platform not in PROFILE_URLS or not username:
+            print(f"Skipping {target!r}: expected platform:username with platform in {list(PROFILE_URLS)}")
+            continue
+        try:
+            response = upstream_get(platform, PROFILE_URLS[platform].format(username), headers=HEADERS)
+        except requests.exceptions.RequestException as e:
+            print(f"Could not fetch {target}: {e}")
+            continue
+        path = os.path.join(PAGES_DIR, f"{platform}_{username}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"Saved {path} ({len(response.text)} chars, status {response.status_code})")
+
+
+def run_benchmark(runs: int) -> None:
+    if not os.path.isdir(PAGES_DIR) or not os.listdir(PAGES_DIR):
+        print(f"No saved pages in {PAGES_DIR}; use --fetch first.")
+        return
+
+    print(
+        f"{'profile':<40} {'size KB':>8} {'median ms':>10} {'min ms':>8} "
+        f"{'executor':>9} {'loop lag ms':>12}"
+    )
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if not name.endswith(".html"):
+            continue
+        platform, _, username = name[: -len(".html")].partition("_")
+        if platform not in PROFILE_URLS:
+            continue
+        with open(os.path.join(PAGES_DIR, name), "r", encoding="utf-8") as f:
+            page = f.read()
+
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            _parse(page, platform, username)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Which executor run_parser_async uses for this page in the app
+        executor = "process" if len(page) >= PARSE_PROCESS_THRESHOLD else "thread"
+        lag = asyncio.run(_max_loop_lag(page, platform, username))
+        print(
+            f"{name:<40} {len(page) / 1024:>8.1f} {statistics.median(timings):>10.2f} "
+            f"{min(timings):>8.2f} {executor:>9} {lag:>12.2f}"
+        )
+    shutdown_parsers()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fetch", nargs="+", metavar="PLATFORM:USERNAME", help="Download and save profile pages")
+    parser.add_argument("--runs", type=int, default=10, help="Parses per page")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_pages(args.fetch)
+    else:
+        run_benchmark(args.runs)
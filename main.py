@@ -1,14 +1,38 @@
-from fastapi import FastAPI, Query
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager, suppress
 from typing import Optional
-import gitingest
+import asyncio
+import json
 
-from tools.github import get_github_stats
+from tools.cache import cached_call
+from tools.github import get_github_stats, project_github_stats
 from tools.leetcode import get_leetcode_stats
 from tools.gfg import get_gfg_stats
+from tools.parsing import shutdown_parsers
+from tools.prefetch import get_prefetch_status, mark_due_if_watched, start_prefetch
+from tools.repo import get_repo_summary, repo_cache_location
+from tools.upstream import get_upstream_status
+from tools.webhooks import (
+    GITHUB_WEBHOOK_SECRET,
+    affected_entries,
+    invalidate_entries,
+    verify_signature,
+)
 # from tools.codeforces import get_codeforces_user_data
 
-app = FastAPI(debug=False)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prefetch_task = start_prefetch()
+    yield
+    prefetch_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await prefetch_task
+    shutdown_parsers()
+
+
+app = FastAPI(debug=False, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -19,76 +43,83 @@ app.add_middleware(
 
 
 @app.get("/github_stats/{username}")
-def github_stats(username: str):
-    return get_github_stats(username)
+def github_stats(
+    username: str,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated repo fields to return, e.g. name,stargazers_count,language_bytes",
+    ),
+) -> dict | None:
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else []
+    stats = cached_call("github", username, get_github_stats, username)
+    try:
+        return project_github_stats(stats, requested)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/leetcode_stats/{username}")
-def leetcode_stats(username: str):
-    return get_leetcode_stats(username)
+def leetcode_stats(username: str) -> dict:
+    return cached_call("leetcode", username, get_leetcode_stats, username)
 
 
 @app.get("/geeksforgeeks_stats/{username}")
-def geeksforgeeks_stats(username: str):
-    stats = get_gfg_stats(username)
+def geeksforgeeks_stats(username: str) -> dict:
+    stats = cached_call("gfg", username, get_gfg_stats, username)
     if "error" in stats:
         return {"status": "error", "data": stats["error"]}
     return {"status": "success", "data": stats}
 
 
 @app.get("/repo_summary/")
-def repo_summary(repo_url: str = Query(..., description="GitHub repository URL")):
+def repo_summary(repo_url: str = Query(..., description="GitHub repository URL")) -> dict:
     """
     Returns summary, tree, and README (as JSON if possible) for a GitHub repo.
     If estimated tokens <= 4k, also embed all code blocks in the README.
     """
-    summary, tree, content = gitingest.ingest(repo_url)
-    readme_json = None
-
-    import re
-    import json
-
-    # Find README section in content (case-insensitive)
-    readme_match = re.search(
-        r"File:\s*README\.md\s*={16,}\s*(.*?)={16,}|File:\s*README\.md\s*-+\s*(.*?)(?:={16,}|$)",
-        content,
-        re.DOTALL | re.IGNORECASE,
-    )
-    readme_text = None
-    if readme_match:
-        readme_text = readme_match.group(1) or readme_match.group(2)
-        readme_text = readme_text.strip() if readme_text else None
-
-    token_match = re.search(r"Estimated tokens:\s*([\d\.]+)k", summary)
-    estimated_tokens = None
-    if token_match:
-        try:
-            estimated_tokens = float(token_match.group(1)) * 1000
-        except Exception:
-            estimated_tokens = None
-
-    # If tokens <= 4000, extract all code blocks from content and append to README
-    code_blocks = []
-    if estimated_tokens is not None and estimated_tokens <= 4000:
-        code_blocks = re.findall(r"```(?:[^\n]*)\n(.*?)```", content, re.DOTALL)
-
-    if readme_text:
-        try:
-            readme_json = json.loads(readme_text)
-        except Exception:
-            readme_json = None
-
-    
-    if code_blocks and readme_text:
-        if readme_json is not None:
-            readme_json["code_blocks"] = code_blocks
-        else:
-            readme_text += "\n\n---\n\n" + "\n\n".join(
-                [f"```python\n{cb}\n```" for cb in code_blocks]
-            )
-
-    return {
-        "summary": summary,
-        "tree": tree,
-        "readme": readme_json if readme_json is not None else readme_text,
-    }
+    # Branch and path segments are case-sensitive, so only the cache key is normalized
+    namespace, key = repo_cache_location(repo_url)
+    return cached_call(namespace, key, get_repo_summary, repo_url)
+
+
+@app.get("/prefetch/status")
+def prefetch_status() -> dict:
+    return {"entries": get_prefetch_status()}
+
+
+@app.get("/upstreams/status")
+def upstreams_status() -> dict:
+    return {"upstreams": get_upstream_status()}
+
+
+@app.post("/github_webhook")
+async def github_webhook(request: Request, background_tasks: BackgroundTasks) -> dict:
+    """
+    Receives GitHub push/repository events and drops the affected /github_stats
+    and /repo_summary cache entries. Watchlisted entries are marked due for the
+    prefetch scheduler.
+    """
+    if not GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="GITHUB_WEBHOOK_SECRET is not configured")
+
+    body = await request.body()
+    if not verify_signature(
+        GITHUB_WEBHOOK_SECRET, body, request.headers.get("X-Hub-Signature-256")
+    ):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+    event = request.headers.get("X-GitHub-Event", "")
+    if event == "ping":
+        return {"status": "success", "data": "pong"}
+    try:
+        payload = json.loads(body)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Payload is not valid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Payload must be a JSON object")
+
+    entries = affected_entries(event, payload)
+    invalidated = invalidate_entries(entries)
+    for platform, target in entries:
+        background_tasks.add_task(mark_due_if_watched, platform, target)
+    return {"status": "success", "data": {"event": event, "invalidated": invalidated}}
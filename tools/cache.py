@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from tools.snapshots import SNAPSHOT_DIR
+
+CACHE_TTL = int(os.getenv("CACHE_TTL", "600"))
+# Entries live on disk so every gunicorn worker sees the same values and invalidations
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(SNAPSHOT_DIR, "cache"))
+
+# Decoded entries kept per worker, least recently used evicted first
+CACHE_MEMO_SIZE = int(os.getenv("CACHE_MEMO_SIZE", "256"))
+# How often expired files are deleted from CACHE_DIR (by the scheduler's worker)
+CACHE_SWEEP_INTERVAL = int(os.getenv("CACHE_SWEEP_INTERVAL", "600"))
+# Leftover temp files from interrupted writes older than this are deleted by the sweep
+_STALE_TMP_SECONDS = 3600
+# Invalidation markers older than this are deleted by the sweep; no fetch runs that long
+_MARKER_SECONDS = 3600
+# Marker files record when a key or a whole namespace was last invalidated (their mtime)
+_MARKER_SUFFIX = ".invalidated"
+
+# path -> ((inode, mtime), entry), so unchanged files aren't re-read on every hit
+_memo: OrderedDict[str, tuple[tuple[int, int], dict]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _cache_path(namespace: str, key: str) -> str:
+    # Usernames and GitHub URLs are case-insensitive
+    digest = hashlib.sha256(key.strip().lower().encode()).hexdigest()
+    return os.path.join(CACHE_DIR, namespace, f"{digest}.json")
+
+
+def _marker_path(namespace: str, key: str | None = None) -> str:
+    if key is None:
+        return os.path.join(CACHE_DIR, namespace, _MARKER_SUFFIX)
+    return _cache_path(namespace, key)[: -len(".json")] + _MARKER_SUFFIX
+
+
+def _mark_invalidated(path: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a"):
+            pass
+        os.utime(path)
+    except OSError as e:
+        print(f"Could not write invalidation marker {path}: {e}")
+
+
+def _invalidated_since(namespace: str, key: str, started: float) -> bool:
+    """True if the key or its namespace was invalidated after `started` (epoch seconds)."""
+    for path in (_marker_path(namespace, key), _marker_path(namespace)):
+        try:
+            if os.path.getmtime(path) >= started:
+                return True
+        except FileNotFoundError:
+            pass
+    return False
+
+
+def _forget(path: str) -> None:
+    with _lock:
+        _memo.pop(path, None)
+
+
+def _remember(path: str, version: tuple[int, int], entry: dict) -> None:
+    with _lock:
+        _memo[path] = (version, entry)
+        _memo.move_to_end(path)
+        while len(_memo) > CACHE_MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def _file_version(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    # Writes go through os.replace, so a new inode means new contents
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _load_file(path: str) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Ignoring unreadable cache entry {path}: {e}")
+        return None
+
+
+def _read_entry(path: str) -> tuple[dict | None, tuple[int, int] | None]:
+    version = _file_version(path)
+    if version is None:
+        _forget(path)
+        return None, None
+    with _lock:
+        memo = _memo.get(path)
+        if memo and memo[0] == version:
+            _memo.move_to_end(path)
+            return memo[1], version
+    entry = _load_file(path)
+    if entry is not None:
+        _remember(path, version, entry)
+    return entry, version
+
+
+def _remove_expired(path: str, version: tuple[int, int]) -> bool:
+    """Delete an expired file, unless another worker has rewritten it since it was read."""
+    _forget(path)
+    if _file_version(path) != version:
+        return False
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def is_cacheable(value) -> bool:
+    """Failed lookups (None or a dict with an "error" key) are never cached."""
+    return value is not None and not (isinstance(value, dict) and "error" in value)
+
+
+def get_cached(namespace: str, key: str):
+    """Return a cached value, or None if it is missing or expired."""
+    path = _cache_path(namespace, key)
+    entry, version = _read_entry(path)
+    if entry is None:
+        return None
+    if entry["expires_at"] < time.time():
+        _remove_expired(path, version)
+        return None
+    return entry["value"]
+
+
+def set_cached(
+    namespace: str, key: str, value, ttl: int | None = None, fetched_at: float | None = None
+) -> bool:
+    """Store a JSON-serializable value for `ttl` seconds (default CACHE_TTL).
+
+    Pass `fetched_at` (time.time() when the fetch started) to drop the value if the
+    key was invalidated while it was being fetched. Returns True if it was stored.
+    """
+    if fetched_at is not None and _invalidated_since(namespace, key, fetched_at):
+        return False
+    ttl = CACHE_TTL if ttl is None else ttl
+    path = _cache_path(namespace, key)
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": time.time() + ttl, "value": value}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Could not write cache entry {path}: {e}")
+        return False
+    return True
+
+
+def invalidate(namespace: str, key: str) -> bool:
+    """Drop a cached value for every worker. Returns True if one was present.
+
+    Fetches already in flight for the key won't cache their (possibly stale) result.
+    """
+    _mark_invalidated(_marker_path(namespace, key))
+    try:
+        os.remove(_cache_path(namespace, key))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def invalidate_namespace(namespace: str) -> int:
+    """Drop every cached value in a namespace. Returns how many were present."""
+    _mark_invalidated(_marker_path(namespace))
+    directory = os.path.join(CACHE_DIR, namespace)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    dropped = 0
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+            dropped += 1
+        except FileNotFoundError:
+            pass
+    return dropped
+
+
+def sweep_expired() -> int:
+    """Delete every expired entry (and stale temp or marker file) under CACHE_DIR. Returns how many."""
+    removed = 0
+    now = time.time()
+    for directory, _, names in os.walk(CACHE_DIR):
+        for name in names:
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp"):
+                max_age = _STALE_TMP_SECONDS
+            elif name.endswith(_MARKER_SUFFIX):
+                max_age = _MARKER_SECONDS
+            else:
+                max_age = None
+            if max_age is not None:
+                try:
+                    if now - os.path.getmtime(path) > max_age:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".json"):
+                continue
+            # Read around the memo, so a sweep neither fills nor evicts it
+            version = _file_version(path)
+            entry = _load_file(path) if version else None
+            if entry is not None and entry["expires_at"] < now and _remove_expired(path, version):
+                removed += 1
+    return removed
+
+
+def cached_call(namespace: str, key: str, fetch, *args):
+    """Return the cached value for (namespace, key), calling `fetch(*args)` on a miss.
+
+    The key is only used for lookup, so a normalized key can front a fetch
+    that needs the caller's original argument.
+    """
+    value = get_cached(namespace, key)
+    if value is not None:
+        return value
+    started = time.time()
+    value = fetch(*args)
+    if is_cacheable(value):
+        set_cached(namespace, key, value, fetched_at=started)
+    return value
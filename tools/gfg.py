@@ -1,6 +1,9 @@
 import requests
 import json
-from bs4 import BeautifulSoup as bs
+from bs4 import BeautifulSoup as bs, SoupStrainer
+
+from tools.parsing import run_parser
+from tools.upstream import upstream_get
 
 def get_gfg_stats(username: str):
     BASE_URL = f'https://auth.geeksforgeeks.org/user/{username}/practice/'
@@ -9,12 +12,22 @@ def get_gfg_stats(username: str):
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
 
-    profilePage = requests.get(BASE_URL, headers=headers)
+    try:
+        profilePage = upstream_get("gfg", BASE_URL, headers=headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Network error fetching GfG profile for {username}: {e}")
+        return {"error": "GeeksforGeeks is unavailable"}
 
     if profilePage.status_code != 200:
         return {"error": "Profile Not Found"}
 
-    soup = bs(profilePage.content, 'html.parser')
+    return run_parser(parse_gfg_profile, profilePage.content, username)
+
+
+def parse_gfg_profile(page: bytes, username: str) -> dict:
+    """Extract stats from a GfG profile page. Runs in the parse executor."""
+    # Only the embedded __NEXT_DATA__ JSON is needed, so skip building the rest of the tree
+    soup = bs(page, 'html.parser', parse_only=SoupStrainer("script", id="__NEXT_DATA__"))
 
     # Find the script tag containing JSON data
     script_tag = soup.find("script", id="__NEXT_DATA__", type="application/json")
@@ -2,6 +2,9 @@ import requests
 import os
 from dotenv import load_dotenv 
 
+from tools.snapshots import load_snapshot, save_snapshot
+from tools.upstream import upstream_get
+
 load_dotenv()
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
@@ -14,6 +17,28 @@ BASE_HEADERS = {"Accept": "application/vnd.github.v3+json"}
 if GITHUB_TOKEN:
     BASE_HEADERS["Authorization"] = f"token {GITHUB_TOKEN}"
 
+# Keys of each entry in stats["repos"], usable with `project_github_stats`
+REPO_FIELDS = (
+    "name",
+    "full_name",
+    "html_url",
+    "description",
+    "fork",
+    "created_at",
+    "updated_at",
+    "pushed_at",
+    "stargazers_count",
+    "watchers_count",
+    "language",
+    "forks_count",
+    "open_issues_count",
+    "license",
+    "topics",
+    "languages",
+)
+# Everything `project_github_stats` accepts: repo keys plus aggregated language bytes
+PROJECTION_FIELDS = REPO_FIELDS + ("language_bytes",)
+
 
 def get_github_stats(username: str) -> dict | None:
     def get_github_user(username):
@@ -21,7 +46,7 @@ def get_github_stats(username: str) -> dict | None:
         url = f"https://api.github.com/users/{username}"
         headers = BASE_HEADERS.copy() 
         try:
-            response = requests.get(url, headers=headers)
+            response = upstream_get("github", url, headers=headers)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -37,17 +62,17 @@ def get_github_stats(username: str) -> dict | None:
         url = f"https://api.github.com/users/{username}/repos?sort=updated&per_page=100"
         headers = BASE_HEADERS.copy()
         try:
-            response = requests.get(url, headers=headers)
+            response = upstream_get("github", url, headers=headers)
             if response.status_code == 200:
                 return response.json()
             else:
                 print(f"Error fetching user repos: Status code {response.status_code}")
                 # Add response text for more detailed error diagnosis
                 print(f"Response: {response.text}")
-                return []
+                return None
         except requests.exceptions.RequestException as e:
             print(f"Network error fetching user repos: {e}")
-            return []
+            return None
 
     def get_repo_languages(username, repo_name):
         """Fetch languages used in a repository"""
@@ -56,7 +81,7 @@ def get_github_stats(username: str) -> dict | None:
         headers = BASE_HEADERS.copy()
         try:
             # Pass updated headers
-            response = requests.get(url, headers=headers)
+            response = upstream_get("github", url, headers=headers)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -65,10 +90,10 @@ def get_github_stats(username: str) -> dict | None:
                 )
                 # Add response text for more detailed error diagnosis
                 print(f"Response: {response.text}")
-                return {}
+                return None
         except requests.exceptions.RequestException as e:
             print(f"Network error fetching languages for repo {repo_name}: {e}")
-            return {}
+            return None
 
     def get_user_stats(username):
         """Fetch GitHub user stats"""
@@ -80,11 +105,29 @@ def get_github_stats(username: str) -> dict | None:
             return None
 
         repos = get_user_repos(username)
+        # A failed listing must not look like a user with no repos, or it gets cached
+        if repos is None:
+            print(f"Could not retrieve repos for {username}. Cannot generate stats.")
+            return None
+
+        # Languages only change on push, so reuse the stored breakdown for
+        # repos whose pushed_at matches the last snapshot
+        snapshot = load_snapshot("github", username).get("repos", {})
+        new_snapshot = {}
         processed_repos = []
         for repo in repos:
-            repo_copy = repo.copy()
-            languages = get_repo_languages(username, repo_copy["name"])
-            repo_copy["languages"] = languages
+            previous = snapshot.get(repo["name"])
+            if previous and previous.get("pushed_at") == repo.get("pushed_at"):
+                languages = previous["languages"]
+            else:
+                languages = get_repo_languages(username, repo["name"])
+            if languages is not None:
+                new_snapshot[repo["name"]] = {
+                    "pushed_at": repo.get("pushed_at"),
+                    "languages": languages,
+                }
+            else:
+                languages = {}
             processed_repos.append(
                 {
                     "name": repo.get("name"),
@@ -114,11 +157,74 @@ def get_github_stats(username: str) -> dict | None:
             "public_repos": user_data["public_repos"],
             "repos": processed_repos,
         }
+        save_snapshot("github", username, {"repos": new_snapshot})
         return stats
 
     return get_user_stats(username)
 
 
+def get_github_rate_limit() -> dict | None:
+    """Fetch the remaining core API quota. This call does not count against it.
+
+    Returns:
+        dict | None: {"remaining": int, "reset": epoch seconds}, or None on error.
+    """
+    try:
+        response = upstream_get(
+            "github", "https://api.github.com/rate_limit", headers=BASE_HEADERS.copy()
+        )
+        if response.status_code == 200:
+            core = response.json()["resources"]["core"]
+            return {"remaining": core["remaining"], "reset": core["reset"]}
+        print(f"Error fetching rate limit: Status code {response.status_code}")
+        return None
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        print(f"Error fetching rate limit: {e}")
+        return None
+
+
+def project_github_stats(stats: dict | None, fields: list[str] | None) -> dict | None:
+    """Trim a stats payload down to the requested repo fields.
+
+    Args:
+        stats (dict | None): The output of `get_github_stats`.
+        fields (list[str] | None): Repo keys to keep. The pseudo-field
+            "language_bytes" adds a top-level map of bytes per language summed
+            over all repos. None or an empty list returns `stats` unchanged.
+
+    Returns:
+        dict | None: The projected stats. "repos" is omitted when no repo
+            field is requested.
+
+    Raises:
+        ValueError: If a field is not in PROJECTION_FIELDS.
+    """
+    unknown = [f for f in fields or [] if f not in PROJECTION_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(PROJECTION_FIELDS)}"
+        )
+    if not stats or not fields:
+        return stats
+
+    repo_fields = [f for f in fields if f in REPO_FIELDS]
+    projected = {k: v for k, v in stats.items() if k != "repos"}
+    if repo_fields:
+        projected["repos"] = [
+            {f: repo.get(f) for f in repo_fields} for repo in stats.get("repos", [])
+        ]
+
+    if "language_bytes" in fields:
+        totals = {}
+        for repo in stats.get("repos", []):
+            for language, size in (repo.get("languages") or {}).items():
+                totals[language] = totals.get(language, 0) + size
+        projected["language_bytes"] = dict(
+            sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        )
+    return projected
+
+
 if __name__ == "__main__":
     target_username = "nevrohelios"
     print(f"Fetching GitHub stats for {target_username}...")
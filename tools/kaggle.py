@@ -5,6 +5,27 @@ import time
 from pprint import pprint
 import re # For potential pattern matching if needed
 
+from tools.parsing import run_parser
+from tools.upstream import upstream_get
+
+# Patterns are compiled once here rather than on every find() call
+DISPLAY_NAME_CLASS = re.compile(r'profile-header__display-name')
+BIO_CLASS = re.compile(r'profile-header__bio')
+METADATA_CLASS = re.compile(r'profile-header__metadata')
+PROGRESSION_CLASS = re.compile(r'profile-progression')
+MEDAL_CLASS = re.compile(r'profile-progression-medal')
+CATEGORY_CLASS = re.compile(r'title|name|category')
+TIER_CLASS = re.compile(r'tier|level|medal-label')
+RANK_CLASS = re.compile(r'rank')
+POINTS_CLASS = re.compile(r'points|score')
+HIGHEST_RANK_TEXT = re.compile(r'Highest Rank|Peak Rank')
+RANK_VALUE_CLASS = re.compile(r'rank|value')
+BADGE_SECTION_CLASS = re.compile(r'profile__badges|badge-section|achievements')
+STATS_CONTAINER_CLASS = re.compile(r'profile-header__meta|profile-stats')
+COUNT_CLASS = re.compile(r'count|value|number')
+RANK_PREFIX = re.compile(r'^(Rank|#)\s*', re.IGNORECASE)
+
+
 def scrape_kaggle_user_details(username: str):
     """
     Scrapes a Kaggle user's public profile page for details using Requests and BeautifulSoup.
@@ -31,7 +52,7 @@ def scrape_kaggle_user_details(username: str):
     try:
         # Add a small delay to be polite
         time.sleep(1)
-        response = requests.get(profile_url, headers=headers, timeout=15)
+        response = upstream_get("kaggle", profile_url, headers=headers, timeout=15)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
 
     except requests.exceptions.HTTPError as e:
@@ -47,8 +68,21 @@ def scrape_kaggle_user_details(username: str):
         print(f"An unexpected error occurred during request: {e}")
         return None
 
+    scraped_data = run_parser(parse_kaggle_profile, response.text, username)
+    if scraped_data is None:
+        return None
+    details["scraped_data"] = scraped_data
+    return details
+
+
+def parse_kaggle_profile(page: str, username: str) -> dict | None:
+    """Extract the scraped_data section of a Kaggle profile page. Runs in the parse executor.
+
+    Returns None if the page cannot be parsed at all.
+    """
+    scraped_data = {}
     try:
-        soup = BeautifulSoup(response.text, 'lxml') # Use lxml parser
+        soup = BeautifulSoup(page, 'lxml') # Use lxml parser
 
         # --- Scrape Specific Details ---
         # Selectors MUST be updated if Kaggle changes its HTML/CSS.
@@ -58,51 +92,53 @@ def scrape_kaggle_user_details(username: str):
         try:
             # Often in an element with specific class, might be an h1 or div
             # Example selector (NEEDS VERIFICATION/ADJUSTMENT):
-            name_element = soup.find('h1', class_=re.compile(r'profile-header__display-name')) # Use regex for potentially dynamic class parts
-            details["scraped_data"]["display_name"] = name_element.text.strip() if name_element else "Not Found"
+            name_element = soup.find('h1', class_=DISPLAY_NAME_CLASS) # Use regex for potentially dynamic class parts
+            scraped_data["display_name"] = name_element.text.strip() if name_element else "Not Found"
         except Exception as e:
             print(f"Warning: Could not parse display name: {e}")
-            details["scraped_data"]["display_name"] = "Error Parsing"
+            scraped_data["display_name"] = "Error Parsing"
 
         # 2. Bio / Tagline
         try:
              # Often a div or p element under the name
              # Example selector (NEEDS VERIFICATION/ADJUSTMENT):
-             bio_element = soup.find('p', class_=re.compile(r'profile-header__bio'))
-             details["scraped_data"]["bio"] = bio_element.text.strip() if bio_element else "Not Found/No Bio"
+             bio_element = soup.find('p', class_=BIO_CLASS)
+             scraped_data["bio"] = bio_element.text.strip() if bio_element else "Not Found/No Bio"
         except Exception as e:
             print(f"Warning: Could not parse bio: {e}")
-            details["scraped_data"]["bio"] = "Error Parsing"
+            scraped_data["bio"] = "Error Parsing"
 
         # 3. Location, Occupation, Employer (Often grouped together)
         try:
             # These might be list items or divs with specific icons/classes
             # Example selector (NEEDS VERIFICATION/ADJUSTMENT):
-            info_list = soup.find('ul', class_=re.compile(r'profile-header__metadata'))
+            info_list = soup.find('ul', class_=METADATA_CLASS)
             if info_list:
                 items = info_list.find_all('li')
                 metadata = {}
                 for item in items:
                     text = item.get_text(strip=True)
+                    # Serialize once; the keyword checks only need the raw markup, not prettify()
+                    item_html = str(item)
                     # Simple keyword matching (might need improvement)
-                    if 'Location' in item.prettify() or 'map-pin' in item.prettify(): # Check class/icon hints
+                    if 'Location' in item_html or 'map-pin' in item_html: # Check class/icon hints
                         metadata['location'] = text
-                    elif 'Occupation' in item.prettify() or 'briefcase' in item.prettify():
+                    elif 'Occupation' in item_html or 'briefcase' in item_html:
                          metadata['occupation'] = text
-                    elif 'Employer' in item.prettify() or 'building' in item.prettify():
+                    elif 'Employer' in item_html or 'building' in item_html:
                          metadata['employer'] = text
-                    elif 'link' in item.prettify(): # Website link
+                    elif 'link' in item_html: # Website link
                          link_tag = item.find('a')
                          metadata['website'] = link_tag['href'] if link_tag else text
                     elif 'Joined' in text: # Join Date (might be less reliable)
                          metadata['joined_approx'] = text.replace('Joined', '').strip()
 
-                details["scraped_data"]["metadata"] = metadata
+                scraped_data["metadata"] = metadata
             else:
-                 details["scraped_data"]["metadata"] = {"status": "Metadata section not found"}
+                 scraped_data["metadata"] = {"status": "Metadata section not found"}
         except Exception as e:
             print(f"Warning: Could not parse metadata (location/job etc): {e}")
-            details["scraped_data"]["metadata"] = {"status": "Error Parsing"}
+            scraped_data["metadata"] = {"status": "Error Parsing"}
 
 
         # 4. Tiers and Ranks (Competitions, Datasets, Notebooks, Discussions)
@@ -111,12 +147,12 @@ def scrape_kaggle_user_details(username: str):
         tiers_data = {}
         try:
             # Find the main progression/tiers section
-            progression_section = soup.find('div', class_=re.compile(r'profile-progression')) # Example class
+            progression_section = soup.find('div', class_=PROGRESSION_CLASS) # Example class
             if progression_section:
                 # Find individual tier items (Competitions, Datasets, etc.)
-                tier_items = progression_section.find_all('a', class_=re.compile(r'profile-progression-medal')) # Link around the medal/info
+                tier_items = progression_section.find_all('a', class_=MEDAL_CLASS) # Link around the medal/info
                 if not tier_items: # Fallback: maybe they are divs/lis?
-                     tier_items = progression_section.find_all('div', class_=re.compile(r'profile-progression-medal'))
+                     tier_items = progression_section.find_all('div', class_=MEDAL_CLASS)
 
                 for item in tier_items:
                     category = "Unknown"
@@ -127,7 +163,7 @@ def scrape_kaggle_user_details(username: str):
 
                     # Extract Category (e.g., "Competitions")
                     # Look for a title or identifiable text within the item
-                    cat_element = item.find(['h4', 'h5', 'span'], class_=re.compile(r'title|name|category')) # Adjust tags/classes
+                    cat_element = item.find(['h4', 'h5', 'span'], class_=CATEGORY_CLASS) # Adjust tags/classes
                     if cat_element:
                          category = cat_element.text.strip()
                     elif item.get('href'): # Try getting from link URL
@@ -137,37 +173,37 @@ def scrape_kaggle_user_details(username: str):
                         elif '/discussion' in item['href']: category = 'Discussions'
 
                     # Extract Tier (e.g., "Master") - often in a span or div with specific class
-                    tier_element = item.find(['span','div'], class_=re.compile(r'tier|level|medal-label')) # Adjust
+                    tier_element = item.find(['span','div'], class_=TIER_CLASS) # Adjust
                     if tier_element:
                         tier = tier_element.text.strip()
 
                     # Extract Rank (e.g., "#123") - often nearby
-                    rank_element = item.find(['span', 'div'], class_=re.compile(r'rank')) # Adjust
+                    rank_element = item.find(['span', 'div'], class_=RANK_CLASS) # Adjust
                     if rank_element:
                         rank_text = rank_element.text.strip()
                         # Clean up common prefixes like "Rank #"
-                        rank = re.sub(r'^(Rank|#)\s*', '', rank_text, flags=re.IGNORECASE)
+                        rank = RANK_PREFIX.sub('', rank_text)
                         if not rank or rank.lower() == 'unranked':
                            rank = "Unranked" # Standardize
 
                     # Extract Points (sometimes available)
-                    points_element = item.find(['span', 'div'], class_=re.compile(r'points|score')) # Adjust
+                    points_element = item.find(['span', 'div'], class_=POINTS_CLASS) # Adjust
                     if points_element:
                         points = points_element.text.strip()
 
                     # Extract Highest Rank/Tier (might be harder, often needs specific text search)
-                    highest_rank_element = item.find(string=re.compile(r'Highest Rank|Peak Rank')) # Search for specific text
+                    highest_rank_element = item.find(string=HIGHEST_RANK_TEXT) # Search for specific text
                     if highest_rank_element:
                        # Try to get the value usually following or nearby this text
                        parent = highest_rank_element.find_parent()
                        if parent:
                            # This logic is highly speculative and needs refinement based on actual HTML
-                           possible_ranks = parent.find_all(['span','div'], class_=re.compile(r'rank|value'))
+                           possible_ranks = parent.find_all(['span','div'], class_=RANK_VALUE_CLASS)
                            if len(possible_ranks) > 1: # Assume the second one might be the highest
                                highest_rank = possible_ranks[-1].text.strip()
                            else: # Or just grab nearby text
                                highest_rank = highest_rank_element.next_sibling.strip() if highest_rank_element.next_sibling else "N/A"
-                           highest_rank = re.sub(r'^(Rank|#)\s*', '', highest_rank, flags=re.IGNORECASE)
+                           highest_rank = RANK_PREFIX.sub('', highest_rank)
 
 
                     if category != "Unknown":
@@ -180,11 +216,11 @@ def scrape_kaggle_user_details(username: str):
             else:
                  tiers_data = {"status": "Tiers section not found"}
 
-            details["scraped_data"]["progression"] = tiers_data
+            scraped_data["progression"] = tiers_data
 
         except Exception as e:
             print(f"Warning: Could not parse progression/tiers: {e}")
-            details["scraped_data"]["progression"] = {"status": "Error Parsing"}
+            scraped_data["progression"] = {"status": "Error Parsing"}
 
 
         # 5. Badges (Can be tricky, often images with titles or specific divs)
@@ -192,7 +228,7 @@ def scrape_kaggle_user_details(username: str):
         try:
             # Find sections likely containing badges (might be multiple)
             # Example selector (NEEDS VERIFICATION/ADJUSTMENT): Adjust class name
-            badge_sections = soup.find_all('div', class_=re.compile(r'profile__badges|badge-section|achievements'))
+            badge_sections = soup.find_all('div', class_=BADGE_SECTION_CLASS)
 
             for section in badge_sections:
                 # Badges might be 'img' tags with titles, or divs/spans
@@ -218,18 +254,18 @@ def scrape_kaggle_user_details(username: str):
                          if len(badge_name) > 3 and 'medal' not in badge_name.lower() and 'tier' not in badge_name.lower(): # Simple filter
                             badges_list.append(badge_name)
 
-            details["scraped_data"]["badges"] = badges_list if badges_list else "No badges found or parsing failed"
+            scraped_data["badges"] = badges_list if badges_list else "No badges found or parsing failed"
 
         except Exception as e:
             print(f"Warning: Could not parse badges: {e}")
-            details["scraped_data"]["badges"] = "Error Parsing Badges"
+            scraped_data["badges"] = "Error Parsing Badges"
 
         # 6. Other Stats (Followers, Following, etc. - might be near name or in stats section)
         # Example selector (NEEDS VERIFICATION/ADJUSTMENT):
         stats = {}
         try:
            # Look for elements containing follower/following counts - often links or spans
-           stats_container = soup.find('div', class_=re.compile(r'profile-header__meta|profile-stats')) # Adjust class
+           stats_container = soup.find('div', class_=STATS_CONTAINER_CLASS) # Adjust class
            if stats_container:
                # Example: Find links with href containing /followers or /following
                follower_link = stats_container.find('a', href=lambda href: href and f'/{username}/followers' in href)
@@ -237,21 +273,21 @@ def scrape_kaggle_user_details(username: str):
 
                if follower_link:
                    # Count is often inside a span or div within the link
-                   count_el = follower_link.find(['span', 'div'], class_=re.compile(r'count|value|number'))
+                   count_el = follower_link.find(['span', 'div'], class_=COUNT_CLASS)
                    stats['followers'] = count_el.text.strip() if count_el else follower_link.text.strip() # Fallback to link text
                if following_link:
-                   count_el = following_link.find(['span', 'div'], class_=re.compile(r'count|value|number'))
+                   count_el = following_link.find(['span', 'div'], class_=COUNT_CLASS)
                    stats['following'] = count_el.text.strip() if count_el else following_link.text.strip()
 
                # Clean possible non-numeric parts (like 'k' for thousands) - optional
                for key in stats:
                    stats[key] = stats[key].split()[0] # Take first part if text is like "1.2k Followers"
 
-           details["scraped_data"]["social_stats"] = stats if stats else {"status": "Social stats not found"}
+           scraped_data["social_stats"] = stats if stats else {"status": "Social stats not found"}
 
         except Exception as e:
             print(f"Warning: Could not parse social stats: {e}")
-            details["scraped_data"]["social_stats"] = {"status": "Error Parsing"}
+            scraped_data["social_stats"] = {"status": "Error Parsing"}
 
 
         # --- Competitions Won / History ---
@@ -260,10 +296,10 @@ def scrape_kaggle_user_details(username: str):
         # Scraping that requires more advanced techniques (like Selenium or analyzing network requests).
         # We already scraped the *summary* (tier/rank) in the 'progression' section above.
         # Adding a placeholder here to acknowledge the limitation.
-        details["scraped_data"]["competition_history"] = "Full history not scraped (likely requires dynamic loading/separate page)"
+        scraped_data["competition_history"] = "Full history not scraped (likely requires dynamic loading/separate page)"
 
 
-        return details
+        return scraped_data
 
     except Exception as e:
         print(f"An error occurred during parsing: {e}")
@@ -1,7 +1,9 @@
-import requests
 import json
+import requests
 from datetime import datetime
 
+from tools.upstream import upstream_get
+
 BASE_URL = "https://leetcode-stats-api.herokuapp.com/"
 
 def get_leetcode_stats(username: str):
@@ -11,10 +13,15 @@ def get_leetcode_stats(username: str):
         username (str): The LeetCode username to fetch stats for.
 
     Returns:
-        dict: A dictionary containing the user's LeetCode stats.
+        dict: A dictionary containing the user's LeetCode stats, or
+            {"error": ...} if the stats API is unreachable.
     """
     url = f"{BASE_URL}{username}"
-    response = requests.get(url)
+    try:
+        response = upstream_get("leetcode", url)
+    except requests.exceptions.RequestException as e:
+        print(f"Network error fetching LeetCode stats for {username}: {e}")
+        return {"error": "LeetCode is unavailable"}
 
     if response.status_code == 200:
         data = response.json()
@@ -0,0 +1,55 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Pages at least this large (in bytes/characters) are parsed in a worker process. Below it,
+# pickling the page costs about as much as the parse; tune with benchmarks/parse_bench.py
+PARSE_PROCESS_THRESHOLD = int(os.getenv("PARSE_PROCESS_THRESHOLD", "200000"))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "2"))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver: forking a worker that already runs route and hedge threads can deadlock
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _pool
+
+
+def run_parser(parse, page, *args):
+    """Run `parse(page, *args)`, in the process pool if the page is large.
+
+    `parse` must be a module-level function returning plain data (no soup
+    objects) so it can cross the process boundary. Small pages are parsed in
+    the calling thread, where pickling would cost more than the parse.
+    """
+    if len(page) < PARSE_PROCESS_THRESHOLD:
+        return parse(page, *args)
+    return _get_pool().submit(parse, page, *args).result()
+
+
+async def run_parser_async(parse, page, *args):
+    """Awaitable `run_parser` for async callers; the parse never runs on the event loop.
+
+    Small pages are parsed in a worker thread, large ones in the process pool.
+    """
+    if len(page) < PARSE_PROCESS_THRESHOLD:
+        return await asyncio.to_thread(parse, page, *args)
+    return await asyncio.get_running_loop().run_in_executor(_get_pool(), parse, page, *args)
+
+
+def shutdown_parsers() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,271 @@
+import asyncio
+import os
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; there the dev server is a single process
+    fcntl = None
+
+from tools.cache import CACHE_SWEEP_INTERVAL, CACHE_TTL, is_cacheable, set_cached, sweep_expired
+from tools.gfg import get_gfg_stats
+from tools.github import get_github_rate_limit, get_github_stats
+from tools.leetcode import get_leetcode_stats
+from tools.repo import get_repo_summary, repo_cache_location
+from tools.snapshots import SNAPSHOT_DIR, load_snapshot, save_snapshot
+
+# Comma-separated "platform:target" entries, e.g.
+# "github:nevrohelios,leetcode:nevrohelios,repo:https://github.com/NevroHelios/automated-data-analysis"
+PREFETCH_WATCHLIST = os.getenv("PREFETCH_WATCHLIST", "")
+PREFETCH_INTERVAL = int(os.getenv("PREFETCH_INTERVAL", "900"))
+# Each entry is refreshed PREFETCH_INTERVAL +/- this fraction after its last refresh
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", "0.1"))
+# Pause between entries so scraped sites never see a burst
+PREFETCH_SPACING = float(os.getenv("PREFETCH_SPACING", "2"))
+# Leave this much GitHub API quota for live requests
+PREFETCH_GITHUB_MIN_REMAINING = int(os.getenv("PREFETCH_GITHUB_MIN_REMAINING", "200"))
+# Only the worker holding this lock runs the scheduler; the others retry every PREFETCH_LEADER_RETRY seconds
+PREFETCH_LOCK_FILE = os.getenv("PREFETCH_LOCK_FILE", os.path.join(SNAPSHOT_DIR, "prefetch.lock"))
+PREFETCH_LEADER_RETRY = 30
+# Longest the scheduler sleeps, so entries marked due by webhooks are picked up promptly
+PREFETCH_POLL_INTERVAL = 30
+# Serializes read-modify-write of the shared status file across workers
+PREFETCH_STATUS_LOCK_FILE = os.path.join(SNAPSHOT_DIR, "prefetch", "status.lock")
+# Warmed entries outlive the longest interval, so they are replaced before they expire
+PREFETCH_CACHE_TTL = int(PREFETCH_INTERVAL * (1 + PREFETCH_JITTER)) + CACHE_TTL
+
+# Cache namespaces match the ones used by the routes in main.py
+FETCHERS = {
+    "github": get_github_stats,
+    "leetcode": get_leetcode_stats,
+    "gfg": get_gfg_stats,
+    "repo": get_repo_summary,
+}
+# Platforms whose fetchers spend GitHub REST API quota
+GITHUB_API_PLATFORMS = {"github"}
+
+_entries: list[tuple[str, str]] = []
+_lock_file = None
+
+
+def parse_watchlist(raw: str) -> list[tuple[str, str]]:
+    """Parse "platform:target,..." into (platform, target) pairs, skipping unknown platforms."""
+    entries = []
+    for item in raw.split(","):
+        platform, sep, target = item.strip().partition(":")
+        platform = platform.strip().lower()
+        if not sep or not target.strip():
+            continue
+        if platform not in FETCHERS:
+            print(f"Ignoring prefetch entry with unknown platform: {item!r}")
+            continue
+        entries.append((platform, target.strip()))
+    return entries
+
+
+def _cache_location(platform: str, target: str) -> tuple[str, str]:
+    # Same locations as the routes in main.py; the original target is still what gets fetched
+    return repo_cache_location(target) if platform == "repo" else (platform, target)
+
+
+def _status_key(platform: str, target: str) -> str:
+    return f"{platform}:{target}"
+
+
+def _load_status() -> dict:
+    # Shared through the snapshot store so every worker reports the scheduler's progress
+    return load_snapshot("prefetch", "status").get("entries", {})
+
+
+@contextmanager
+def _status_lock():
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(PREFETCH_STATUS_LOCK_FILE), exist_ok=True)
+    with open(PREFETCH_STATUS_LOCK_FILE, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _update_status(platform: str, target: str, **fields) -> None:
+    with _status_lock():
+        status = _load_status()
+        entry = status.setdefault(_status_key(platform, target), {})
+        entry.update(fields)
+        save_snapshot("prefetch", "status", {"entries": status})
+
+
+def get_prefetch_status() -> list[dict]:
+    """Last refresh time, duration and outcome for every watchlist entry."""
+    status = _load_status()
+    return [
+        {
+            "platform": platform,
+            "target": target,
+            "status": "pending",
+            "last_refresh": None,
+            "next_refresh": None,
+            "duration_seconds": None,
+            "error": None,
+            **status.get(_status_key(platform, target), {}),
+        }
+        for platform, target in _entries
+    ]
+
+
+def _next_refresh(after: float) -> str:
+    delay = PREFETCH_INTERVAL * random.uniform(1 - PREFETCH_JITTER, 1 + PREFETCH_JITTER)
+    return datetime.fromtimestamp(after + delay, timezone.utc).isoformat()
+
+
+def _refresh_entry(platform: str, target: str) -> None:
+    started = time.perf_counter()
+    fetched_at = time.time()
+    fields = {}
+    try:
+        value = FETCHERS[platform](target)
+        if is_cacheable(value):
+            namespace, key = _cache_location(platform, target)
+            if set_cached(namespace, key, value, ttl=PREFETCH_CACHE_TTL, fetched_at=fetched_at):
+                fields.update(status="ok", error=None)
+            else:
+                # Invalidated mid-fetch (or unwritable): refetch on the next cycle
+                fields.update(
+                    status="discarded", error=None, next_refresh=datetime.now(timezone.utc).isoformat()
+                )
+        else:
+            error = value.get("error") if isinstance(value, dict) else "No data"
+            fields.update(status="error", error=error)
+    except Exception as e:
+        fields.update(status="error", error=str(e))
+    fields["duration_seconds"] = round(time.perf_counter() - started, 3)
+    fields["last_refresh"] = datetime.now(timezone.utc).isoformat()
+    fields.setdefault("next_refresh", _next_refresh(time.time()))
+    _update_status(platform, target, **fields)
+
+
+def _same_target(platform: str, a: str, b: str) -> bool:
+    if platform == "repo":
+        return repo_cache_location(a)[0] == repo_cache_location(b)[0]
+    return a.lower() == b.lower()
+
+
+def mark_due_if_watched(platform: str, target: str) -> bool:
+    """Mark watchlist entries for a user or repo as due. Returns True if there were any.
+
+    The scheduler refreshes them on its next pass, with the usual quota check and
+    spacing, so a burst of events for one entry costs a single refresh. For repos,
+    every watched URL of the repo (branches, subpaths) is marked.
+    """
+    marked = False
+    now = datetime.now(timezone.utc).isoformat()
+    for watched_platform, watched_target in _entries:
+        if watched_platform == platform and _same_target(platform, watched_target, target):
+            _update_status(watched_platform, watched_target, next_refresh=now)
+            marked = True
+    return marked
+
+
+def _github_quota_reset() -> float | None:
+    """Epoch seconds when the GitHub quota resets, if it is below the reserve; else None."""
+    rate_limit = get_github_rate_limit()
+    if rate_limit is None or rate_limit["remaining"] >= PREFETCH_GITHUB_MIN_REMAINING:
+        return None
+    return rate_limit["reset"]
+
+
+def _seconds_until_due(platform: str, target: str, status: dict) -> float:
+    next_refresh = status.get(_status_key(platform, target), {}).get("next_refresh")
+    if not next_refresh:
+        return 0.0
+    return datetime.fromisoformat(next_refresh).timestamp() - time.time()
+
+
+async def run_prefetch_cycle(entries: list[tuple[str, str]]) -> None:
+    """Refresh the entries that are due, one at a time, honouring the GitHub quota."""
+    status = await asyncio.to_thread(_load_status)
+    due = [e for e in entries if _seconds_until_due(*e, status) <= 0]
+    github_checked = False
+    github_reset = None
+    for i, (platform, target) in enumerate(due):
+        if platform in GITHUB_API_PLATFORMS:
+            if not github_checked:
+                github_reset = await asyncio.to_thread(_github_quota_reset)
+                github_checked = True
+            if github_reset is not None:
+                await asyncio.to_thread(
+                    _update_status,
+                    platform,
+                    target,
+                    status="skipped: rate limited",
+                    next_refresh=datetime.fromtimestamp(github_reset, timezone.utc).isoformat(),
+                )
+                continue
+        await asyncio.to_thread(_refresh_entry, platform, target)
+        if i < len(due) - 1:
+            await asyncio.sleep(PREFETCH_SPACING)
+
+
+def _acquire_leadership() -> bool:
+    global _lock_file
+    if fcntl is None:
+        return True
+    os.makedirs(os.path.dirname(PREFETCH_LOCK_FILE) or ".", exist_ok=True)
+    lock_file = open(PREFETCH_LOCK_FILE, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    # The lock is released when this worker exits, letting another one take over
+    _lock_file = lock_file
+    return True
+
+
+def _release_leadership() -> None:
+    global _lock_file
+    if _lock_file is not None:
+        _lock_file.close()
+        _lock_file = None
+
+
+async def run_prefetch_loop(entries: list[tuple[str, str]]) -> None:
+    while not await asyncio.to_thread(_acquire_leadership):
+        await asyncio.sleep(PREFETCH_LEADER_RETRY)
+    print(f"Worker {os.getpid()} is running the prefetch scheduler")
+    next_sweep = 0.0
+    try:
+        while True:
+            if time.time() >= next_sweep:
+                removed = await asyncio.to_thread(sweep_expired)
+                if removed:
+                    print(f"Removed {removed} expired cache files")
+                next_sweep = time.time() + CACHE_SWEEP_INTERVAL
+            delay = next_sweep - time.time()
+            if entries:
+                await run_prefetch_cycle(entries)
+                # Schedule from each entry's last refresh, so a new leader doesn't redo fresh entries
+                status = await asyncio.to_thread(_load_status)
+                delay = min([delay] + [_seconds_until_due(*e, status) for e in entries])
+            await asyncio.sleep(min(max(delay, PREFETCH_SPACING), PREFETCH_POLL_INTERVAL))
+    finally:
+        _release_leadership()
+
+
+def start_prefetch() -> asyncio.Task:
+    """Start the scheduler loop: watchlist refreshes plus the cache sweep.
+
+    Every worker calls this; only the one holding PREFETCH_LOCK_FILE does the work.
+    """
+    global _entries
+    _entries = parse_watchlist(PREFETCH_WATCHLIST)
+    if _entries:
+        print(f"Prefetching {len(_entries)} watchlist entries every ~{PREFETCH_INTERVAL}s")
+    return asyncio.create_task(run_prefetch_loop(_entries))
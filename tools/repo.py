@@ -0,0 +1,82 @@
+import json
+import re
+
+import gitingest
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    """Canonical form of a GitHub repo URL, used as its cache key.
+
+    "github.com/Owner/Repo.git/" and "https://github.com/owner/repo" map to the same key.
+    """
+    url = repo_url.strip().lower().rstrip("/")
+    url = re.sub(r"^(https?://)?(www\.)?", "https://", url)
+    if url.endswith(".git"):
+        url = url[: -len(".git")]
+    return url
+
+
+def repo_cache_location(repo_url: str) -> tuple[str, str]:
+    """(namespace, key) under which a /repo_summary result is cached.
+
+    Every URL of one repo (branches, subpaths) shares a namespace, so a webhook
+    for the repo can drop them all at once.
+    """
+    url = normalize_repo_url(repo_url)
+    match = re.match(r"https://github\.com/([a-z0-9-]+)/([a-z0-9_.-]+)", url)
+    repo_id = f"{match.group(1)}__{match.group(2)}" if match else "other"
+    return f"repo/{repo_id}", url
+
+
+def get_repo_summary(repo_url: str) -> dict:
+    """
+    Returns summary, tree, and README (as JSON if possible) for a GitHub repo.
+    If estimated tokens <= 4k, also embed all code blocks in the README.
+    """
+    summary, tree, content = gitingest.ingest(repo_url)
+    readme_json = None
+
+    # Find README section in content (case-insensitive)
+    readme_match = re.search(
+        r"File:\s*README\.md\s*={16,}\s*(.*?)={16,}|File:\s*README\.md\s*-+\s*(.*?)(?:={16,}|$)",
+        content,
+        re.DOTALL | re.IGNORECASE,
+    )
+    readme_text = None
+    if readme_match:
+        readme_text = readme_match.group(1) or readme_match.group(2)
+        readme_text = readme_text.strip() if readme_text else None
+
+    token_match = re.search(r"Estimated tokens:\s*([\d\.]+)k", summary)
+    estimated_tokens = None
+    if token_match:
+        try:
+            estimated_tokens = float(token_match.group(1)) * 1000
+        except Exception:
+            estimated_tokens = None
+
+    # If tokens <= 4000, extract all code blocks from content and append to README
+    code_blocks = []
+    if estimated_tokens is not None and estimated_tokens <= 4000:
+        code_blocks = re.findall(r"```(?:[^\n]*)\n(.*?)```", content, re.DOTALL)
+
+    if readme_text:
+        try:
+            readme_json = json.loads(readme_text)
+        except Exception:
+            readme_json = None
+
+    
+    if code_blocks and readme_text:
+        if readme_json is not None:
+            readme_json["code_blocks"] = code_blocks
+        else:
+            readme_text += "\n\n---\n\n" + "\n\n".join(
+                [f"```python\n{cb}\n```" for cb in code_blocks]
+            )
+
+    return {
+        "summary": summary,
+        "tree": tree,
+        "readme": readme_json if readme_json is not None else readme_text,
+    }
@@ -0,0 +1,53 @@
+import json
+import os
+import re
+import tempfile
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", ".snapshots")
+
+
+def _snapshot_path(namespace: str, key: str) -> str:
+    # Usernames are case-insensitive on most platforms; keep file names safe
+    safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", key.lower())
+    return os.path.join(SNAPSHOT_DIR, namespace, f"{safe_key}.json")
+
+
+def load_snapshot(namespace: str, key: str) -> dict:
+    """Load a stored snapshot.
+
+    Args:
+        namespace (str): Group of snapshots, e.g. "github".
+        key (str): Entry within the namespace, e.g. a username.
+
+    Returns:
+        dict: The stored snapshot, or an empty dict if there is none.
+    """
+    path = _snapshot_path(namespace, key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return {}
+
+
+def save_snapshot(namespace: str, key: str, data: dict) -> None:
+    """Persist a snapshot, replacing any previous one atomically."""
+    path = _snapshot_path(namespace, key)
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # A unique temp file per write, since threads and workers may save the same key at once
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Could not write snapshot {path}: {e}")
+
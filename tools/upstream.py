@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+# Consecutive failures before a breaker opens, and seconds before it lets a probe through
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+# Comma-separated upstream names that get a second, hedged attempt, e.g. "leetcode,gfg"
+HEDGED_UPSTREAMS = {
+    name.strip() for name in os.getenv("HEDGED_UPSTREAMS", "").split(",") if name.strip()
+}
+# Hedge delay used until enough latencies have been seen to estimate the p95
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "2"))
+HEDGE_MIN_SAMPLES = 20
+# Sized like the route threadpool (AnyIO's default of 40), since every hedged call holds a
+# thread for its first attempt and losing attempts keep theirs until they finish or time out
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "40"))
+
+_hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+# One slot per pool thread; attempts are only submitted when a thread is free, never queued
+_hedge_slots = threading.BoundedSemaphore(HEDGE_MAX_WORKERS)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose breaker is open.
+
+    Subclasses RequestException so existing network error handling covers it.
+    """
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream errors, then lets one probe through to test recovery."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.latencies = deque(maxlen=200)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(f"Circuit open for upstream '{self.name}'")
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+            self.latencies.append(latency)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"Opening circuit for upstream '{self.name}' after {self.failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before hedging: the p95 of recent successful latencies."""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return samples[int(len(samples) * 0.95) - 1]
+
+    def status(self) -> dict:
+        return {
+            "upstream": self.name,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "hedged": self.name in HEDGED_UPSTREAMS,
+            "hedge_delay_seconds": round(self.hedge_delay(), 3),
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+            )
+        return _breakers[name]
+
+
+def get_upstream_status() -> list[dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.status() for breaker in breakers]
+
+
+def _timed_get(started: threading.Event, url: str, kwargs: dict) -> requests.Response:
+    started.set()
+    return requests.get(url, **kwargs)
+
+
+def _submit_attempt(url: str, kwargs: dict):
+    """Start a request on a free hedge thread, returning (future, started) or None if all are busy."""
+    if not _hedge_slots.acquire(blocking=False):
+        return None
+    started = threading.Event()
+    try:
+        future = _hedge_executor.submit(_timed_get, started, url, kwargs)
+    except BaseException:
+        _hedge_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hedge_slots.release())
+    return future, started
+
+
+def _hedged_get(breaker: CircuitBreaker, url: str, kwargs: dict) -> requests.Response:
+    first = _submit_attempt(url, kwargs)
+    if first is None:
+        # No free thread to hedge with; a plain request keeps latency bounded by the timeout
+        return requests.get(url, **kwargs)
+    first_future, first_started = first
+
+    # The hedge delay counts from when the request is actually sent
+    first_started.wait()
+    done, _ = wait([first_future], timeout=breaker.hedge_delay())
+    if done:
+        return first_future.result()
+
+    second = _submit_attempt(url, kwargs)
+    pending = {first_future} if second is None else {first_future, second[0]}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except requests.exceptions.RequestException as e:
+                error = e
+    raise error
+
+
+def upstream_get(name: str, url: str, **kwargs) -> requests.Response:
+    """`requests.get` guarded by the circuit breaker for `name`.
+
+    Applies UPSTREAM_TIMEOUT unless a timeout is given. Network errors and 5xx
+    responses count as failures; other responses are returned as-is. Upstreams
+    listed in HEDGED_UPSTREAMS get a second attempt if the first is slower
+    than their recent p95 latency.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        requests.exceptions.RequestException: On network errors.
+    """
+    kwargs.setdefault("timeout", UPSTREAM_TIMEOUT)
+    breaker = get_breaker(name)
+    breaker.before_call()
+
+    started = time.perf_counter()
+    try:
+        if name in HEDGED_UPSTREAMS:
+            response = _hedged_get(breaker, url, kwargs)
+        else:
+            response = requests.get(url, **kwargs)
+    except BaseException:
+        # Any escape must be recorded, or a half-open breaker keeps its probe slot forever
+        breaker.record_failure()
+        raise
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success(time.perf_counter() - started)
+    return response
@@ -0,0 +1,97 @@
+import hashlib
+import hmac
+import json
+import os
+
+from tools.cache import invalidate, invalidate_namespace
+from tools.repo import normalize_repo_url, repo_cache_location
+
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+
+# Events that can change /github_stats or /repo_summary output
+HANDLED_EVENTS = {"push", "repository"}
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """X-Hub-Signature-256 header value for `body`, as GitHub computes it."""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+def affected_entries(event: str, payload: dict) -> list[tuple[str, str]]:
+    """Users and repos made stale by a GitHub event, as (platform, target) pairs.
+
+    Args:
+        event (str): The X-GitHub-Event header, e.g. "push".
+        payload (dict): The parsed event body.
+
+    Returns:
+        list[tuple[str, str]]: e.g. [("github", "octocat"), ("repo", "https://github.com/octocat/hello")]
+    """
+    if event not in HANDLED_EVENTS:
+        return []
+    repository = payload.get("repository")
+    if not isinstance(repository, dict) or not isinstance(repository.get("owner"), dict):
+        return []
+    owner = repository["owner"].get("login")
+    html_url = repository.get("html_url")
+    if not owner or not html_url:
+        return []
+
+    entries = [("github", owner), ("repo", normalize_repo_url(html_url))]
+
+    changes = payload.get("changes") or {}
+    if event == "repository" and payload.get("action") == "renamed":
+        old_name = ((changes.get("repository") or {}).get("name") or {}).get("from")
+        if old_name:
+            entries.append(("repo", normalize_repo_url(f"https://github.com/{owner}/{old_name}")))
+    elif event == "repository" and payload.get("action") == "transferred":
+        previous = (changes.get("owner") or {}).get("from") or {}
+        previous_owner = (previous.get("user") or previous.get("organization") or {}).get("login")
+        if previous_owner:
+            entries.append(("github", previous_owner))
+            entries.append((
+                "repo",
+                normalize_repo_url(f"https://github.com/{previous_owner}/{repository.get('name')}"),
+            ))
+    return entries
+
+
+def invalidate_entries(entries: list[tuple[str, str]]) -> list[dict]:
+    """Drop the cached responses for each user or repo, reporting how many were cached."""
+    results = []
+    for platform, target in entries:
+        if platform == "repo":
+            # Covers every branch/subpath URL of the repo, not just its root
+            dropped = invalidate_namespace(repo_cache_location(target)[0])
+        else:
+            dropped = int(invalidate(platform, target))
+        results.append({"platform": platform, "target": target, "entries_dropped": dropped})
+    return results
+
+
+if __name__ == "__main__":
+    # Print a signed sample push event and a curl command to replay it locally
+    secret = GITHUB_WEBHOOK_SECRET or "local-test-secret"
+    body = json.dumps({
+        "ref": "refs/heads/main",
+        "repository": {
+            "name": "automated-data-analysis",
+            "full_name": "NevroHelios/automated-data-analysis",
+            "html_url": "https://github.com/NevroHelios/automated-data-analysis",
+            "owner": {"login": "NevroHelios"},
+        },
+    }).encode()
+    print(f"Secret: {secret}")
+    print(
+        "curl -X POST http://localhost:8000/github_webhook "
+        "-H 'Content-Type: application/json' -H 'X-GitHub-Event: push' "
+        f"-H 'X-Hub-Signature-256: {sign_payload(secret, body)}' "
+        f"-d '{body.decode()}'"
+    )